@@ -4,166 +4,158 @@ Figure out who owns how much to whom, and generate minimal amount of transfers b
 
 import argparse
 import csv
-import heapq
 import logging
+import sys
+from collections import namedtuple
 from decimal import Decimal
-from numbers import Number
-from typing import Callable, Sequence
-from typing import TypeVar
-
-T = TypeVar("T")
+from heapq import heapify, heappop, heappush
 
 # see here https://stackoverflow.com/a/38537983
 logging.basicConfig()
 logging.getLogger().setLevel(logging.DEBUG)
 info = logging.info
 
+# expense records as parallel lists: sponsor ids, amounts in cents, tuples of debtor ids
+Records = namedtuple("Records", "sponsor amount debtors")
 
-class PrioFuncHeap:
-    """
-    Heap data struct for easily accessing smallest element. Supports an optional prio_func which allows for deriving
-    priority from heap entries for added flexibility.
-
-    Based on this: https://docs.python.org/3/library/heapq.html
-
-    Motivated by wanting encapsulation in a class, heap functionality without changing underlying data and more
-    flexible sorting
-    """
 
-    data: list = None
-    # don't want implicit 'self' argument here, thus staticmethod
-    prio_func: Callable[[T], Number] = staticmethod(lambda x: x)
-
-    def __init__(
-        self, data: Sequence[T], prio_func: Callable[[T], Number] = None
-    ) -> None:
-        if prio_func is not None:
-            self.prio_func = prio_func
-        self.data = [(self.prio_func(item), item) for item in data]
-        heapq.heapify(self.data)
-
-    def push(self, item: T) -> None:
-        """
-        put item on heap based on priority calculated by prio_func(item).
-        :param item:
-        :return: None
-        """
-        heapq.heappush(self.data, (self.prio_func(item), item))
-
-    def pop(self) -> T:
-        """
-        remove lowest-priority item from heap and return it, where priority is determined by prio_func(item)
-        :return: item with lowest priority
-        """
-        prio, item = heapq.heappop(self.data)
-        return item
-
-    def __len__(self) -> int:
-        return len(self.data)
-
-    def __iter__(self) -> T:
-        while len(self.data) > 0:
-            yield self.pop()
-
-
-def resolve_transfers(balances: dict):
+def resolve_transfers(balances: list):
     """
     given a balance for each person, determine who should transfer whom how much money. positive balance = person
     should receive money from the group, mutatis mutandis for negative. greedily tries to find minimum amount of
     transfers necessary to balance accounts under the constraint that people with positive balance should never have
     to transfer money to others, given that they already gave some advance to the group
-    :param balances: {person: balance} dict
-    :return: list of transactions to be carried out, list of remaining unbalanced debts, same for credit
+    :param balances: list of balances in cents, indexed by person id
+    :return: list of transactions between person ids to be carried out, list of remaining unbalanced (-amount, person)
+    debts in heap order, same for credit
     """
 
-    credit_recs = [
-        (balance, person) for person, balance in balances.items() if balance > 0
-    ]
-    # highest balance = lowest priority for this heap
-    credit_heap: PrioFuncHeap = PrioFuncHeap(credit_recs, lambda rec: -1 * rec[0])
-
-    # make debts positive amounts, no need to track sign after splitting balances by pos/neg
-    debt_recs = [
-        (-1 * balance, person) for person, balance in balances.items() if balance < 0
-    ]
-    # highest balance = lowest priority for this heap
-    debt_heap: PrioFuncHeap = PrioFuncHeap(debt_recs, lambda rec: -1 * rec[0])
+    credit_heap: list = []
+    debt_heap: list = []
+    for person, balance in enumerate(balances):
+        if balance > 0:
+            # heapq is a min-heap, store negated balances so that highest balance comes first
+            credit_heap.append((-balance, person))
+        elif balance < 0:
+            # debts are negative already, so highest debt comes first without negating
+            debt_heap.append((balance, person))
+    heapify(credit_heap)
+    heapify(debt_heap)
 
     transactions: list = []
     while len(credit_heap) > 0 and len(debt_heap) > 0:
-        debt, debtor = debt_heap.pop()
-        credit, creditor = credit_heap.pop()
+        # flip signs back, no need to track them after splitting balances by pos/neg
+        neg_debt, debtor = heappop(debt_heap)
+        debt = -neg_debt
+        neg_credit, creditor = heappop(credit_heap)
+        credit = -neg_credit
 
         # don't transfer more than debtor owes/creditor is owed
-        transaction_amount: Decimal = min(debt, credit)
+        transaction_amount: int = min(debt, credit)
         transactions.append(
             {"sender": debtor, "receiver": creditor, "amount": transaction_amount}
         )
 
-        remaining_credit = credit - transaction_amount
-        if remaining_credit > 0:
-            # creditor is still owed money
-            credit_heap.push((remaining_credit, creditor))
+        if debt == credit:
+            # exact match, both are settled
+            continue
 
-        remaining_debt = debt - transaction_amount
-        if remaining_debt > 0:
+        if credit > debt:
+            # creditor is still owed money
+            heappush(credit_heap, (debt - credit, creditor))
+        else:
             # debtor still owes money
-            debt_heap.push((remaining_debt, debtor))
+            heappush(debt_heap, (credit - debt, debtor))
 
-    unbalanced_debt = list(debt_heap)
-    unbalanced_credit = list(credit_heap)
-    return transactions, unbalanced_debt, unbalanced_credit
+    # leftovers are only reported, no need to drain heaps in order
+    return transactions, debt_heap, credit_heap
 
 
-def calculate_balances(records):
+def cents_to_decimal(cents: int) -> Decimal:
+    """
+    convert an integer amount of cents back into a Decimal currency amount, e.g. for display
+    :param cents:
+    :return: Decimal with two decimal places
+    """
+    return Decimal(cents).scaleb(-2)
+
+
+def calculate_balances(records, nr_people: int) -> list:
     """
     calculate balances
     balances -> for each transaction on record, figure out how much each debtor owes to sponsor
     easiest to also include sponsor as (implicitly) one of the debtors, as that person also has to pay fraction of
     overall price
-    thus: each person involved in transaction has to pay (amount / nr_all_people_involved), subtract this from balance
-    and at the same time, sponsor gets amount paid added to their balance
-    :param records: iterable of dicts listing amounts paid as well as who paid (creditor) and who needs to pay back (
-    debtors)
-    :return: {person: balance} dict, where positive balance = group owes this person money, negative balance = person
-    needs to pay money to group
+    thus: each person involved in transaction has to pay (amount // nr_all_people_involved), subtract this from balance
+    and at the same time, sponsor gets amount paid added to their balance. cents left over from the split are charged
+    one-by-one to the first debtors, so balances always add up to zero
+    :param records: Records listing who paid (creditor), amount paid in cents and who needs to pay back (debtors),
+    people given as ids
+    :param nr_people: number of distinct person ids in records
+    :return: list of balances in cents indexed by person id, where positive balance = group owes this person money,
+    negative balance = person needs to pay money to group
     """
-    balances = dict()
-    for rec in records:
-        sponsor = rec["sponsor"]
-        debtors = rec["debtors"]
-        amount = rec["amount"]
-        all_people: list = [sponsor] + debtors
-
-        # sponsor gets credited with amount paid
-        prev_balance_spons = balances.get(sponsor, Decimal("0.00"))
-        balances[sponsor] = prev_balance_spons + amount
-
-        # everyone involved in the transaction gets charged with amount owed
-        owed = amount / len(all_people)
-        for person in all_people:
-            prev_balance = balances.get(person, Decimal("0.00"))
-            # rounding to full cents
-            balances[person] = (prev_balance - owed).quantize(Decimal("0.01"))
+    balances = [0] * nr_people
+    for sponsor, amount, debtors in zip(
+        records.sponsor, records.amount, records.debtors
+    ):
+        # everyone involved in the transaction gets charged with amount owed, in full cents
+        owed, remainder = divmod(amount, 1 + len(debtors))
+
+        # sponsor gets credited with amount paid, minus their own share
+        balances[sponsor] += amount - owed
+        for person in debtors:
+            balances[person] -= owed
+
+        if remainder == 0:
+            # evenly split, no cents left over to distribute
+            continue
+
+        # remainder is smaller than the nr of people involved, so there are always enough debtors to cover it
+        for person in debtors[:remainder]:
+            balances[person] -= 1
     return balances
 
 
-def load_records(records_file: str) -> list:
+def load_records(records_file: str) -> tuple:
     """
-    read expense records from `records_file` and parse into list of dicts. does some value conversions along the way
+    read expense records from `records_file` and parse into Records of parallel sponsor/amount/debtors lists. does some
+    value conversions along the way, amounts are converted to integer cents and people to dense integer ids
     :param records_file:
-    :return:
+    :return: list of names indexed by person id, Records
     """
+    name_to_id: dict = {}
+    names: list = []
+
+    def ident(name: str) -> int:
+        person = name_to_id.get(name)
+        if person is None:
+            person = len(names)
+            name_to_id[name] = person
+            names.append(name)
+        return person
+
     with open(records_file, "r", newline="") as f:
-        reader = csv.DictReader(f)
-        records: list = []
+        reader = csv.reader(f)
+        records = Records(sponsor=[], amount=[], debtors=[])
+        header = next(reader, None)
+        if header is None:
+            # empty file, nothing on record
+            return names, records
+        i_sponsor = header.index("sponsor")
+        i_amount = header.index("amount")
+        i_debtors = header.index("debtors")
         for row in reader:
-            row["amount"] = Decimal(row["amount"])
-            # noinspection PyTypeChecker
-            row["debtors"] = row["debtors"].split(",")
-            records.append(row)
+            if not row:
+                # skip blank lines, like csv.DictReader does
+                continue
+            records.sponsor.append(ident(row[i_sponsor]))
+            records.amount.append(round(Decimal(row[i_amount]) * 100))
+            records.debtors.append(
+                tuple(ident(name) for name in row[i_debtors].split(","))
+            )
 
-    return records
+    return names, records
 
 
 def main(records_file: str) -> None:
@@ -172,28 +164,34 @@ def main(records_file: str) -> None:
     :param records_file:
     :return:
     """
-    records = load_records(records_file)
-    balances = calculate_balances(records)
-
-    print("final balances:")
-    for person, balance in balances.items():
-        print(f"{person}:\t\t{balance}")
+    names, records = load_records(records_file)
+    balances = calculate_balances(records, len(names))
+    # records are not needed any more, free them before settling up
+    del records
 
     transactions, neg_debts, neg_credits = resolve_transfers(balances)
 
-    print("transactions:")
-    for transaction in transactions:
-        print(
-            f'{transaction["sender"]}\ttransfers\t{transaction["amount"]}\tto\t{transaction["receiver"]}'
-        )
+    lines: list = ["final balances:"]
+    lines += [
+        f"{names[person]}:\t\t{cents_to_decimal(balance)}"
+        for person, balance in enumerate(balances)
+    ]
+
+    lines.append("transactions:")
+    lines += [
+        f'{names[transaction["sender"]]}\ttransfers\t{cents_to_decimal(transaction["amount"])}\tto\t{names[transaction["receiver"]]}'
+        for transaction in transactions
+    ]
 
     for amount, person in neg_debts:
-        print("missed debt due to rounding:")
-        print(f"{person}: {abs(amount)}")
+        lines.append("missed debt due to rounding:")
+        lines.append(f"{names[person]}: {cents_to_decimal(abs(amount))}")
 
     for amount, person in neg_credits:
-        print("missed credit due to rounding:")
-        print(f"{person}: {abs(amount)}")
+        lines.append("missed credit due to rounding:")
+        lines.append(f"{names[person]}: {cents_to_decimal(abs(amount))}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":